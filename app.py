@@ -1,12 +1,284 @@
-from flask import Flask, request, jsonify
+from collections import OrderedDict
+from concurrent.futures import Future
+from flask import Flask, Response, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+import hashlib
+import json
 import os
-import requests
+import re
+import threading
+import time
+import httpx
+
+try:  # optional: faster JSON encoding/decoding
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:  # optional: semantic cache backed by Redis
+    from redisvl.extensions.llmcache import SemanticCache
+    from redisvl.query.filter import Tag
+    from redisvl.utils.vectorize import HFTextVectorizer
+except ImportError:  # pragma: no cover - optional dependency
+    SemanticCache = None
+
+
+_NON_ASCII = re.compile(r'[^\x00-\x7f]')
+
+
+def _json_escape(match):
+    code = ord(match.group())
+    if code < 0x10000:
+        return '\\u%04x' % code
+    code -= 0x10000
+    return '\\u%04x\\u%04x' % (0xd800 | code >> 10, 0xdc00 | code & 0x3ff)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes with orjson.
+
+    Honours the provider's ``sort_keys``, ``ensure_ascii`` and indentation
+    settings so output matches :class:`DefaultJSONProvider`. Falls back to
+    Flask's default encoder for values orjson cannot handle.
+    """
+
+    def dumps(self, obj, **kwargs):
+        indent = kwargs.get('indent')
+        if indent not in (None, 2):
+            return super().dumps(obj, **kwargs)
+        option = 0
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if indent is not None:
+            option |= orjson.OPT_INDENT_2
+        try:
+            text = orjson.dumps(obj, option=option).decode()
+        except TypeError:
+            return super().dumps(obj, **kwargs)
+        if kwargs.get('ensure_ascii', self.ensure_ascii) and not text.isascii():
+            text = _NON_ASCII.sub(_json_escape, text)
+        return text
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 
 OLLAMA_HOST = os.getenv('OLLAMA_HOST', 'http://localhost:11434')
 OLLAMA_MODEL = os.getenv('OLLAMA_MODEL', 'qwen3')
 
+# Read/connect timeouts for upstream calls so a hung Ollama socket cannot
+# pin a worker forever.
+OLLAMA_TIMEOUT = httpx.Timeout(60.0, connect=3.0)
+
+# Shared client so keep-alive connections to Ollama are reused across
+# requests. HTTP/2 is negotiated when OLLAMA_HOST is an https:// endpoint,
+# letting concurrent calls multiplex over a single connection.
+HTTP = httpx.Client(
+    transport=httpx.HTTPTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(max_connections=256, max_keepalive_connections=64),
+    ),
+    timeout=OLLAMA_TIMEOUT,
+)
+
+class LLMCache:
+    """In-memory LRU cache of chat responses with a time-to-live."""
+
+    def __init__(self, ttl_seconds=1800, max_entries=1024):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._cache: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, model, prompt, temperature):
+        raw = json.dumps(
+            {'model': model, 'prompt': prompt, 'temperature': temperature},
+            sort_keys=True,
+        )
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, model, prompt, temperature=None):
+        key = self._key(model, prompt, temperature)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            value, ts = entry
+            if time.time() - ts >= self.ttl:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return value
+
+    def set(self, model, prompt, value, temperature=None):
+        key = self._key(model, prompt, temperature)
+        with self._lock:
+            self._cache[key] = (value, time.time())
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+
+class SemanticLLMCache:
+    """Redis-backed cache that also matches paraphrased prompts.
+
+    Exposes the same ``get``/``set`` interface as :class:`LLMCache` but
+    looks prompts up by embedding similarity via RedisVL.
+    """
+
+    def __init__(self, redis_url, ttl_seconds=1800, distance_threshold=0.1,
+                 embedding_model='redis/langcache-embed-v1'):
+        self._cache = SemanticCache(
+            name='mcp_llmcache',
+            redis_url=redis_url,
+            distance_threshold=distance_threshold,
+            ttl=ttl_seconds,
+            vectorizer=HFTextVectorizer(embedding_model),
+            filterable_fields=[
+                {'name': 'model', 'type': 'tag'},
+                {'name': 'temperature', 'type': 'tag'},
+            ],
+        )
+
+    @staticmethod
+    def _temperature_tag(temperature):
+        return 'default' if temperature is None else str(temperature)
+
+    def get(self, model, prompt, temperature=None):
+        # The cache is only an optimization: a Redis or RedisVL failure is
+        # logged and treated as a miss so the request still reaches Ollama.
+        try:
+            match = (Tag('model') == model) & (
+                Tag('temperature') == self._temperature_tag(temperature)
+            )
+            hits = self._cache.check(prompt=prompt, num_results=1, filter_expression=match)
+        except Exception:
+            app.logger.warning('Semantic cache lookup failed', exc_info=True)
+            return None
+        if not hits:
+            return None
+        return {'response': hits[0]['response']}
+
+    def set(self, model, prompt, value, temperature=None):
+        try:
+            self._cache.store(
+                prompt=prompt,
+                response=value['response'],
+                filters={'model': model, 'temperature': self._temperature_tag(temperature)},
+            )
+        except Exception:
+            app.logger.warning('Semantic cache store failed', exc_info=True)
+
+
+CACHE_TTL = int(os.getenv('CHAT_CACHE_TTL', '1800'))
+REDIS_URL = os.getenv('REDIS_URL')
+
+CACHE = None
+if REDIS_URL and SemanticCache is not None:
+    # RedisVL connects and creates its index here; if Redis is unreachable
+    # keep serving with the in-process cache rather than failing to import.
+    try:
+        CACHE = SemanticLLMCache(
+            REDIS_URL,
+            ttl_seconds=CACHE_TTL,
+            distance_threshold=float(os.getenv('CHAT_CACHE_DISTANCE', '0.1')),
+        )
+    except Exception:
+        app.logger.warning(
+            'Semantic cache unavailable, using in-process cache', exc_info=True
+        )
+if CACHE is None:
+    CACHE = LLMCache(
+        ttl_seconds=CACHE_TTL,
+        max_entries=int(os.getenv('CHAT_CACHE_SIZE', '1024')),
+    )
+
+
+# Identical prompts that arrive while an upstream call for them is still
+# running wait on that call instead of issuing their own.
+_INFLIGHT: dict[str, Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+
+def coalesce(key, fn):
+    """Run ``fn()`` once for all concurrent callers sharing *key*."""
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(key)
+        leader = future is None
+        if leader:
+            future = Future()
+            _INFLIGHT[key] = future
+    if not leader:
+        return future.result()
+    try:
+        result = fn()
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _INFLIGHT_LOCK:
+            _INFLIGHT.pop(key, None)
+
+
+def generate(payload):
+    """Call Ollama's generate endpoint and return the reply body."""
+    response = HTTP.post(
+        f"{OLLAMA_HOST}/api/generate",
+        json={**payload, "stream": False},
+    )
+    response.raise_for_status()
+    data = response.json()
+    return {'response': data.get('response', '')}
+
+
+def generate_stream(payload):
+    """Start a streaming generate call and return an iterator of text chunks.
+
+    The upstream request is issued eagerly so connection and HTTP errors
+    surface before the first chunk is sent to the client. Errors reported
+    mid-stream raise ``RuntimeError`` from the iterator.
+    """
+    upstream = HTTP.build_request(
+        'POST',
+        f"{OLLAMA_HOST}/api/generate",
+        json={**payload, "stream": True},
+    )
+    response = HTTP.send(upstream, stream=True)
+    try:
+        response.raise_for_status()
+    except httpx.HTTPStatusError:
+        response.close()
+        raise
+
+    def chunks():
+        # Only returns normally once Ollama has sent its final ``done`` part;
+        # an ``error`` part or a stream cut short raises instead.
+        try:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                part = orjson.loads(line) if orjson is not None else json.loads(line)
+                if 'error' in part:
+                    raise RuntimeError(f"Ollama error: {part['error']}")
+                if part.get('response'):
+                    yield part['response']
+                if part.get('done'):
+                    return
+            raise RuntimeError('Ollama stream ended before completion')
+        finally:
+            response.close()
+
+    return chunks()
+
+
 @app.route('/', methods=['GET'])
 def index():
     return jsonify({'message': 'MCP server running'})
@@ -17,17 +289,48 @@ def chat():
     prompt = data.get('prompt', '')
     if not prompt:
         return jsonify({'error': 'No prompt provided'}), 400
+    temperature = data.get('temperature')
+    payload = {"model": OLLAMA_MODEL, "prompt": prompt}
+    if temperature is not None:
+        payload["options"] = {"temperature": temperature}
+    # Sampling with a non-zero temperature is not deterministic, so only
+    # reuse answers for default or greedy requests. Temperature is part of
+    # the cache key so greedy requests never get a default-sampled reply.
+    cacheable = not temperature
+    stream = bool(data.get('stream'))
+    if cacheable:
+        cached = CACHE.get(OLLAMA_MODEL, prompt, temperature)
+        if cached is not None:
+            if stream:
+                return Response(cached['response'], mimetype='text/plain')
+            return jsonify(cached)
     try:
-        response = requests.post(
-            f"{OLLAMA_HOST}/api/generate",
-            json={"model": OLLAMA_MODEL, "prompt": prompt}
-        )
-        response.raise_for_status()
-        data = response.json()
-        reply = data.get('response', '')
-        return jsonify({'response': reply})
+        if stream:
+            chunks = generate_stream(payload)
+
+            def relay():
+                parts = []
+                for chunk in chunks:
+                    parts.append(chunk)
+                    yield chunk
+                # Reached only after a complete stream, so partial replies
+                # are never cached.
+                if cacheable:
+                    CACHE.set(OLLAMA_MODEL, prompt, {'response': ''.join(parts)}, temperature)
+
+            return Response(stream_with_context(relay()), mimetype='text/plain')
+        if cacheable:
+            def fetch():
+                body = generate(payload)
+                CACHE.set(OLLAMA_MODEL, prompt, body, temperature)
+                return body
+            key = json.dumps(payload, sort_keys=True)
+            body = coalesce(key, fetch)
+        else:
+            body = generate(payload)
+        return jsonify(body)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000)
+    app.run(host='0.0.0.0', port=5000, threaded=True)
@@ -9,15 +9,74 @@ scripts without pulling in heavy dependencies.
 
 from __future__ import annotations
 
+import asyncio
+import atexit
+import functools
+import hashlib
+import io
 import json
+import multiprocessing
 import os
+import re
+import shutil
 import subprocess
+import sys
 import tempfile
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional
 
-import requests
+import httpx
+
+try:  # optional: SQLite helpers (missing on some minimal Python builds)
+    import sqlite3
+except ImportError:  # pragma: no cover - optional dependency
+    sqlite3 = None
+
+try:  # optional: MongoDB helpers
+    from pymongo import MongoClient
+except ImportError:  # pragma: no cover - optional dependency
+    MongoClient = None
+
+try:  # optional: faster JSON encoding/decoding
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:  # optional: libuv-based event loop for request_many
+    import uvloop
+except ImportError:  # pragma: no cover - optional dependency
+    uvloop = None
+
+try:  # optional: HTML parsing helpers
+    import soupsieve
+    from bs4 import BeautifulSoup
+except ImportError:  # pragma: no cover - optional dependency
+    BeautifulSoup = None
+    soupsieve = None
+
+try:  # optional: JWT helpers
+    import jwt
+except ImportError:  # pragma: no cover - optional dependency
+    jwt = None
+
+try:  # optional: in-process git status via libgit2
+    import pygit2
+except ImportError:  # pragma: no cover - optional dependency
+    pygit2 = None
+
+try:  # optional: faster parser backend for BeautifulSoup
+    import lxml  # noqa: F401
+
+    _HTML_PARSER = "lxml"
+except ImportError:  # pragma: no cover - optional dependency
+    _HTML_PARSER = "html.parser"
 
 
 @dataclass
@@ -29,33 +88,227 @@ class ExecResult:
     return_code: int
 
 
+# ---------------------------------------------------------------------------
+# Process spawning
+# ---------------------------------------------------------------------------
+
+@functools.lru_cache(maxsize=None)
+def _which(program: str) -> str:
+    """Resolve *program* to an absolute path, falling back to the bare name."""
+    return shutil.which(program) or program
+
+
+def _run(argv: List[str], cwd: Optional[str] = None) -> ExecResult:
+    """Run *argv* without a shell and capture its output.
+
+    The executable is resolved to an absolute path and ``close_fds`` is
+    disabled so that, when *cwd* is ``None``, :mod:`subprocess` can use
+    ``posix_spawn`` instead of ``fork``/``exec``.  Only descriptors that were
+    explicitly marked inheritable are passed on to the child.
+    """
+    argv = [_which(argv[0]), *argv[1:]]
+    try:
+        proc = subprocess.run(
+            argv, capture_output=True, text=True, cwd=cwd, close_fds=False, check=False
+        )
+    except FileNotFoundError as e:
+        return ExecResult("", str(e), 127)
+    return ExecResult(proc.stdout, proc.stderr, proc.returncode)
+
+
 # ---------------------------------------------------------------------------
 # Code execution & filesystem tools
 # ---------------------------------------------------------------------------
 
-def run_python(code: str) -> ExecResult:
-    """Execute a Python snippet and return the result."""
+_PY_WORKERS: Optional[ProcessPoolExecutor] = None
+_PY_WORKERS_UNAVAILABLE = False
+_PY_WORKERS_GUARD = threading.Lock()
+
+
+def _warm_worker() -> None:
+    """Preimport modules that snippets commonly use."""
+    import collections  # noqa: F401
+    import datetime  # noqa: F401
+    import itertools  # noqa: F401
+    import math  # noqa: F401
+    import re  # noqa: F401
+
+
+def _python_workers() -> Optional[ProcessPoolExecutor]:
+    """Return the shared worker pool, or ``None`` if workers cannot start.
+
+    Spawned workers re-import the caller's ``__main__``; when that is not
+    possible (e.g. a script without an ``if __name__ == "__main__"`` guard)
+    the first probe breaks the pool and callers fall back to a subprocess.
+    """
+    global _PY_WORKERS, _PY_WORKERS_UNAVAILABLE
+    with _PY_WORKERS_GUARD:
+        if _PY_WORKERS is None and not _PY_WORKERS_UNAVAILABLE:
+            pool = ProcessPoolExecutor(
+                max_workers=max(2, (os.cpu_count() or 2) // 2),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+            try:
+                pool.submit(_warm_worker).result()
+            except BrokenProcessPool:
+                pool.shutdown(wait=False)
+                _PY_WORKERS_UNAVAILABLE = True
+            else:
+                _PY_WORKERS = pool
+        return _PY_WORKERS
+
+
+def _discard_python_workers(pool: ProcessPoolExecutor) -> None:
+    global _PY_WORKERS
+    with _PY_WORKERS_GUARD:
+        if _PY_WORKERS is pool:
+            _PY_WORKERS = None
+    pool.shutdown(wait=False)
+
+
+@atexit.register
+def _shutdown_python_workers() -> None:
+    if _PY_WORKERS is not None:
+        _PY_WORKERS.shutdown(wait=False, cancel_futures=True)
+
+
+def _exec_snippet(code: str) -> ExecResult:
+    """Run *code* in the current (worker) process, capturing its output.
+
+    File descriptors 1 and 2 are redirected to temporary files for the
+    duration of the call, so output from child processes, ``os.write`` and
+    C extensions is captured along with ``print``.
+    """
+    saved_streams = sys.stdout, sys.stderr
+    for stream in saved_streams:
+        if stream is not None:
+            stream.flush()
+    saved_fds = os.dup(1), os.dup(2)
+    return_code = 0
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        os.dup2(out.fileno(), 1)
+        os.dup2(err.fileno(), 2)
+        sys.stdout = io.TextIOWrapper(open(1, "wb", buffering=0, closefd=False), write_through=True)
+        sys.stderr = io.TextIOWrapper(open(2, "wb", buffering=0, closefd=False), write_through=True)
+        try:
+            exec(compile(code, "<snippet>", "exec"), {"__name__": "__main__"})
+        except SystemExit as e:
+            if e.code is None:
+                return_code = 0
+            elif isinstance(e.code, int):
+                return_code = e.code
+            else:
+                print(e.code, file=sys.stderr)
+                return_code = 1
+        except BaseException as e:
+            # Drop this function's frame so the traceback starts at the snippet.
+            traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+            return_code = 1
+        finally:
+            sys.stdout, sys.stderr = saved_streams
+            os.dup2(saved_fds[0], 1)
+            os.dup2(saved_fds[1], 2)
+            os.close(saved_fds[0])
+            os.close(saved_fds[1])
+        out.seek(0)
+        err.seek(0)
+        stdout = io.TextIOWrapper(out, errors="replace").read()
+        stderr = io.TextIOWrapper(err, errors="replace").read()
+    return ExecResult(stdout, stderr, return_code)
+
+
+def run_python(code: str, pooled: bool = False) -> ExecResult:
+    """Execute a Python snippet and return the result.
+
+    By default the snippet runs in a fresh interpreter.  With
+    ``pooled=True`` it runs in one of a pool of prewarmed worker processes
+    instead, which avoids interpreter startup on every call.  Pooled snippets
+    get fresh globals but share process-wide state (imported modules, the
+    working directory, environment variables) with others run on the same
+    worker, and one that never returns keeps its worker busy for good.  If
+    the pool cannot start, the snippet runs in a fresh interpreter.
+    """
+    pool = _python_workers() if pooled else None
+    if pool is not None:
+        try:
+            return pool.submit(_exec_snippet, code).result()
+        except BrokenProcessPool:
+            _discard_python_workers(pool)
+            return ExecResult("", "Python worker process exited unexpectedly\n", 1)
+
     with tempfile.NamedTemporaryFile("w", suffix=".py", delete=False) as tmp:
         tmp.write(code)
         tmp_path = tmp.name
     try:
-        proc = subprocess.run(
-            ["python", tmp_path], capture_output=True, text=True, check=False
-        )
-        return ExecResult(proc.stdout, proc.stderr, proc.returncode)
+        return _run([sys.executable, tmp_path])
     finally:
         os.unlink(tmp_path)
 
 
 def list_files(path: str) -> List[str]:
     """Return a list of files for the given path."""
-    return [str(p) for p in Path(path).iterdir()]
+    with os.scandir(path) as it:
+        return [entry.path for entry in it]
+
+
+def list_files_detailed(path: str) -> Iterator[tuple[str, bool, int]]:
+    """Yield ``(name, is_dir, size)`` for each entry in *path*.
+
+    ``is_dir`` comes from the directory entry type returned by the OS, so only
+    the size costs a ``stat`` call (none at all on Windows).  Symlinks are not
+    followed.
+    """
+    with os.scandir(path) as it:
+        for entry in it:
+            yield (
+                entry.name,
+                entry.is_dir(follow_symlinks=False),
+                entry.stat(follow_symlinks=False).st_size,
+            )
 
 
 def read_file(path: str) -> str:
-    """Read a file and return its contents."""
-    with open(path, "r", encoding="utf-8") as f:
-        return f.read()
+    """Read a file and return its contents.
+
+    Line endings are normalised to ``"\\n"`` as in text mode.  Callers that
+    do not need a ``str`` should use :func:`read_file_bytes` or
+    :func:`stream_file` instead to avoid the decode.
+    """
+    with open(path, "rb") as f:
+        text = f.read().decode("utf-8")
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def read_file_bytes(path: str) -> bytearray:
+    """Read a file into a single preallocated buffer without decoding it.
+
+    The buffer is sized from ``st_size`` and grown if the file turns out to
+    be longer, so pseudo-files reporting size 0 (``/proc``, FIFOs, devices)
+    and files that grow while being read are returned in full.
+    """
+    with open(path, "rb", buffering=0) as f:
+        buf = bytearray(max(os.fstat(f.fileno()).st_size + 1, 1 << 16))
+        pos = 0
+        while True:
+            if pos == len(buf):
+                buf.extend(bytes(len(buf)))
+            with memoryview(buf) as view, view[pos:] as free:
+                n = f.readinto(free)
+            if not n:
+                break
+            pos += n
+        del buf[pos:]
+        return buf
+
+
+def stream_file(path: str) -> BinaryIO:
+    """Open *path* for streaming, e.g. ``flask.send_file(stream_file(path))``.
+
+    Handing a real file object to ``send_file`` lets the WSGI server use
+    ``sendfile(2)`` where available. The caller owns the returned file.
+    """
+    return open(path, "rb", buffering=1 << 20)
 
 
 def write_file(path: str, content: str) -> None:
@@ -72,129 +325,501 @@ def write_file(path: str, content: str) -> None:
 def run_cmd(command: str, cwd: Optional[str] = None) -> ExecResult:
     """Execute an arbitrary shell command."""
     proc = subprocess.run(
-        command, shell=True, capture_output=True, text=True, cwd=cwd, check=False
+        command,
+        shell=True,
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+        close_fds=False,
+        check=False,
     )
     return ExecResult(proc.stdout, proc.stderr, proc.returncode)
 
 
+# The git helpers pass ``-C <cwd>`` rather than ``cwd=`` so they stay on the
+# posix_spawn fast path, and build argument lists so user input is never
+# interpreted by a shell.
+
 def clone(repo_url: str, dest: str) -> ExecResult:
     """Clone a git repository."""
-    return run_cmd(f"git clone {repo_url} {dest}")
+    return _run(["git", "clone", "--", repo_url, dest])
+
+
+_GIT_REPOS: Dict[str, Any] = {}
+
+
+def _git_repo(cwd: str) -> Any:
+    """Return a cached ``pygit2.Repository`` for *cwd*, or ``None``.
+
+    ``None`` is also returned for bare repositories, which have no working
+    tree to report on.
+    """
+    key = os.path.abspath(cwd)
+    repo = _GIT_REPOS.get(key)
+    if repo is None:
+        path = pygit2.discover_repository(key)
+        if path is None:
+            return None
+        repo = _GIT_REPOS.setdefault(key, pygit2.Repository(path))
+    return None if repo.is_bare else repo
+
+
+_CONFLICT_CODES = {
+    # (ancestor, ours, theirs) present in the index -> porcelain XY code
+    (True, False, False): "DD",
+    (False, True, False): "AU",
+    (True, True, False): "UD",
+    (False, False, True): "UA",
+    (True, False, True): "DU",
+    (False, True, True): "AA",
+    (True, True, True): "UU",
+}
+
+_C_ESCAPES = {
+    0x07: "\\a", 0x08: "\\b", 0x09: "\\t", 0x0A: "\\n", 0x0B: "\\v",
+    0x0C: "\\f", 0x0D: "\\r", 0x22: '\\"', 0x5C: "\\\\",
+}
+
+
+def _quote_path(path: str, quote_non_ascii: bool = True) -> str:
+    """Quote *path* the way ``git status --short`` does.
+
+    Paths containing spaces, quotes, backslashes or control characters (and
+    non-ASCII bytes, unless ``core.quotePath`` is off) are wrapped in double
+    quotes with C-style escapes; other special bytes become octal escapes.
+    """
+    raw = path.encode("utf-8", "surrogateescape")
+
+    def special(b: int) -> bool:
+        return b < 0x20 or b in (0x22, 0x5C, 0x7F) or (quote_non_ascii and b >= 0x80)
+
+    if not any(b == 0x20 or special(b) for b in raw):
+        return path
+    out = bytearray(b'"')
+    for b in raw:
+        if b in _C_ESCAPES:
+            out += _C_ESCAPES[b].encode("ascii")
+        elif special(b):
+            out += b"\\%03o" % b
+        else:
+            out.append(b)
+    out += b'"'
+    return out.decode("utf-8", "surrogateescape")
+
+
+def _git_quote_path_enabled(repo: Any) -> bool:
+    try:
+        return repo.config.get_bool("core.quotePath")
+    except (KeyError, pygit2.GitError):
+        return True
+
+
+def _conflict_codes(repo: Any) -> Dict[str, str]:
+    """Map each conflicted path to its porcelain code, e.g. ``AA`` or ``DU``."""
+    index = repo.index
+    index.read(False)
+    conflicts = index.conflicts
+    if conflicts is None:
+        return {}
+    codes = {}
+    for ancestor, ours, theirs in conflicts:
+        entry = ancestor or ours or theirs
+        key = (ancestor is not None, ours is not None, theirs is not None)
+        codes[entry.path] = _CONFLICT_CODES[key]
+    return codes
+
+
+def _short_status_code(flags: int) -> str:
+    """Translate libgit2 status *flags* into a porcelain ``XY`` code.
+
+    Conflicts are reported as ``UU`` here; :func:`status` refines them from
+    the index.
+    """
+    fs = pygit2.enums.FileStatus
+    if flags & fs.CONFLICTED:
+        return "UU"
+    if flags & fs.WT_NEW and not flags & ~fs.WT_NEW:
+        return "??"
+    x = (
+        "A" if flags & fs.INDEX_NEW
+        else "M" if flags & fs.INDEX_MODIFIED
+        else "D" if flags & fs.INDEX_DELETED
+        else "R" if flags & fs.INDEX_RENAMED
+        else "T" if flags & fs.INDEX_TYPECHANGE
+        else " "
+    )
+    y = (
+        "M" if flags & fs.WT_MODIFIED
+        else "D" if flags & fs.WT_DELETED
+        else "R" if flags & fs.WT_RENAMED
+        else "T" if flags & fs.WT_TYPECHANGE
+        else " "
+    )
+    return x + y
 
 
 def status(cwd: str) -> str:
-    """Return `git status --short` output for *cwd*."""
-    result = run_cmd("git status --short", cwd=cwd)
-    return result.stdout
+    """Return `git status --short` output for *cwd*.
+
+    With :mod:`pygit2` installed the status is computed in-process and the
+    repository handle is reused across calls; otherwise ``git`` is spawned.
+    Paths are shown relative to *cwd* and quoted as git does.  Unlike git,
+    the in-process path does not detect renames: a renamed file is listed
+    as a deletion plus an addition.
+    """
+    repo = _git_repo(cwd) if pygit2 is not None else None
+    if repo is None:
+        return _run(["git", "-C", cwd, "status", "--short"]).stdout
+    try:
+        entries = repo.status(untracked_files="normal")
+        conflicts = (
+            _conflict_codes(repo)
+            if any(flags & pygit2.enums.FileStatus.CONFLICTED for flags in entries.values())
+            else {}
+        )
+        quote_non_ascii = _git_quote_path_enabled(repo)
+    except pygit2.GitError:
+        return _run(["git", "-C", cwd, "status", "--short"]).stdout
+
+    # git orders entries by repository path, not by the cwd-relative form.
+    tracked, untracked = [], []
+    for path, flags in entries.items():
+        code = conflicts.get(path) or _short_status_code(flags)
+        (untracked if code == "??" else tracked).append((path, code))
+    lines = []
+    for path, code in sorted(tracked) + sorted(untracked):
+        rel = os.path.relpath(os.path.join(repo.workdir, path), cwd)
+        if path.endswith("/"):
+            rel += "/"
+        lines.append(f"{code} {_quote_path(rel, quote_non_ascii)}\n")
+    return "".join(lines)
 
 
 def commit(cwd: str, message: str) -> ExecResult:
     """Create a git commit with the given message."""
-    return run_cmd(f"git commit -am {json.dumps(message)}", cwd=cwd)
+    return _run(["git", "-C", cwd, "commit", "-am", message])
 
 
 def push(cwd: str, remote: str, branch: str) -> ExecResult:
     """Push to the specified remote and branch."""
-    return run_cmd(f"git push {remote} {branch}", cwd=cwd)
+    return _run(["git", "-C", cwd, "push", "--", remote, branch])
 
 
 # ---------------------------------------------------------------------------
 # HTTP client & simple OpenAPI helpers
 # ---------------------------------------------------------------------------
 
+#: Default timeout used by :func:`request`.
+REQUEST_TIMEOUT = httpx.Timeout(30.0, connect=3.0)
+
+# Module-level client so repeated calls reuse pooled keep-alive connections;
+# HTTPS hosts that support HTTP/2 multiplex concurrent calls on one socket.
+_HTTP = httpx.Client(
+    transport=httpx.HTTPTransport(
+        http2=True,
+        retries=2,
+        limits=httpx.Limits(max_connections=256, max_keepalive_connections=64),
+    ),
+    timeout=REQUEST_TIMEOUT,
+    follow_redirects=True,
+)
+
+
+def _header_dict(headers: httpx.Headers) -> Dict[str, str]:
+    """Flatten *headers* into a dict keeping the server's header-name casing.
+
+    Repeated headers are joined with ``", "``, as ``requests`` does.
+    """
+    result: Dict[str, str] = {}
+    names: Dict[str, str] = {}
+    for raw_name, raw_value in headers.raw:
+        name, value = raw_name.decode(headers.encoding), raw_value.decode(headers.encoding)
+        first = names.setdefault(name.lower(), name)
+        if first in result:
+            result[first] += ", " + value
+        else:
+            result[first] = value
+    return result
+
+
 def request(method: str, url: str, headers: Optional[Dict[str, str]] = None, body: str | None = None) -> Dict[str, Any]:
     """Perform an HTTP request and return a simplified response."""
-    resp = requests.request(method, url, headers=headers, data=body)
-    return {"status": resp.status_code, "headers": dict(resp.headers), "body": resp.text}
+    resp = _HTTP.request(method, url, headers=headers, content=body)
+    return {"status": resp.status_code, "headers": _header_dict(resp.headers), "body": resp.text}
+
+
+async def _request_all(calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    limits = httpx.Limits(max_connections=200, max_keepalive_connections=100)
+    async with httpx.AsyncClient(
+        http2=True, limits=limits, timeout=30, follow_redirects=True
+    ) as client:
+
+        async def one(call: Dict[str, Any]) -> Dict[str, Any]:
+            resp = await client.request(
+                call["method"], call["url"], headers=call.get("headers"), content=call.get("body")
+            )
+            return {"status": resp.status_code, "headers": _header_dict(resp.headers), "body": resp.text}
+
+        return await asyncio.gather(*(one(call) for call in calls))
+
+
+def request_many(calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Perform several HTTP requests concurrently.
+
+    Each item of *calls* takes the same keys as the arguments of
+    :func:`request` (``method``, ``url`` and optional ``headers``/``body``).
+    Results are returned in the same order.  The requests share one client,
+    so calls to the same HTTPS host are multiplexed over HTTP/2.  Must not be
+    called from inside a running event loop.
+    """
+    if not calls:
+        return []
+    return _run_async(_request_all(calls))
+
+
+def _run_async(coro: Any) -> Any:
+    """Run *coro* to completion on uvloop when available, else asyncio.
+
+    uvloop's loop runs inside libuv and would block every other greenlet, so
+    the stdlib loop (whose selector gevent patches) is kept under gevent.
+    """
+    if uvloop is not None and not _gevent_patched():
+        return uvloop.run(coro)
+    return asyncio.run(coro)
+
+
+def _gevent_patched() -> bool:
+    monkey = sys.modules.get("gevent.monkey")
+    return monkey is not None and monkey.is_module_patched("socket")
 
 
 def generate_spec(endpoints: List[Dict[str, Any]]) -> str:
-    """Generate a minimal OpenAPI-like spec from endpoint definitions."""
-    return json.dumps({"openapi": "3.0.0", "endpoints": endpoints}, indent=2)
+    """Generate a minimal OpenAPI-like spec from endpoint definitions.
+
+    Non-string keys such as integer status codes become strings, as with
+    :func:`json.dumps`.  With orjson installed, non-ASCII text is written as
+    UTF-8 rather than ``\\u`` escapes.
+    """
+    spec = {"openapi": "3.0.0", "endpoints": endpoints}
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                spec, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+            ).decode()
+        except TypeError:
+            pass
+    return json.dumps(spec, indent=2)
 
 
 def validate_request(spec: str, request_info: Dict[str, Any]) -> bool:
     """Very small helper to check if request_info matches any endpoint in *spec*.
 
+    Endpoint paths may contain ``{param}`` placeholders, each matching one
+    path segment, e.g. ``/users/{id}`` matches ``/users/42``.
+
     This is **not** a full OpenAPI validation, just a convenience function.
     """
-    data = json.loads(spec)
+    key = (request_info.get("method"), request_info.get("path"))
+    if not _hashable(key):
+        return False
+    method, path = key
+    exact, templated = _spec_index(spec)
+    if key in exact:
+        return True
+    pattern = templated.get(method)
+    return pattern is not None and isinstance(path, str) and pattern.fullmatch(path) is not None
+
+
+_PATH_PARAM = re.compile(r"\{[^/{}]+\}")
+
+
+def _hashable(value: Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+@functools.lru_cache(maxsize=32)
+def _spec_index(spec: str) -> tuple[frozenset, Dict[Any, re.Pattern]]:
+    """Parse *spec* once and index its endpoints.
+
+    Returns the set of literal ``(method, path)`` pairs plus, per method, one
+    compiled regex matching all of that method's templated paths.  Endpoints
+    whose method or path is not hashable (e.g. a list) can never match and
+    are skipped.
+    """
+    data = orjson.loads(spec) if orjson is not None else json.loads(spec)
+    exact = set()
+    templated: Dict[Any, List[str]] = {}
     for ep in data.get("endpoints", []):
-        if ep.get("method") == request_info.get("method") and ep.get("path") == request_info.get("path"):
-            return True
-    return False
+        method, path = ep.get("method"), ep.get("path")
+        if not _hashable((method, path)):
+            continue
+        exact.add((method, path))
+        if isinstance(path, str) and _PATH_PARAM.search(path):
+            literal_parts = _PATH_PARAM.split(path)
+            templated.setdefault(method, []).append("[^/]+".join(map(re.escape, literal_parts)))
+    patterns = {method: re.compile("|".join(alts)) for method, alts in templated.items()}
+    return frozenset(exact), patterns
 
 
 # ---------------------------------------------------------------------------
 # Database helpers (SQLite + optional MongoDB)
 # ---------------------------------------------------------------------------
 
+_SQLITE_CONNS: Dict[str, Any] = {}
+_SQLITE_LOCKS: Dict[str, threading.Lock] = {}
+_SQLITE_GUARD = threading.Lock()
+
+
+def _sqlite_conn(database: str) -> tuple[Any, threading.Lock]:
+    """Return the cached connection for *database* and the lock guarding it.
+
+    Connections are opened once in autocommit mode and tuned for throughput
+    (WAL journal, relaxed fsync, in-memory temp tables).  Because the
+    connection is kept open, ``":memory:"`` databases now persist across
+    calls for the lifetime of the process.
+    """
+    if sqlite3 is None:
+        raise RuntimeError("SQL helpers require the sqlite3 module")
+    with _SQLITE_GUARD:
+        conn = _SQLITE_CONNS.get(database)
+        if conn is None:
+            conn = sqlite3.connect(database, check_same_thread=False, isolation_level=None)
+            conn.executescript(
+                "PRAGMA journal_mode=WAL;"
+                "PRAGMA synchronous=NORMAL;"
+                "PRAGMA temp_store=MEMORY;"
+                "PRAGMA cache_size=-65536;"
+            )
+            _SQLITE_CONNS[database] = conn
+            _SQLITE_LOCKS[database] = threading.Lock()
+        return conn, _SQLITE_LOCKS[database]
+
+
 def execute_sql(conn_params: Dict[str, Any], query: str) -> List[tuple]:
     """Execute an SQL query using sqlite3."""
-    import sqlite3
-
-    conn = sqlite3.connect(conn_params.get("database", ":memory:"))
-    cur = conn.cursor()
-    cur.execute(query)
-    rows = cur.fetchall()
-    conn.commit()
-    conn.close()
-    return rows
+    conn, lock = _sqlite_conn(conn_params.get("database", ":memory:"))
+    with lock:
+        return conn.execute(query).fetchall()
 
 
 def run_migration(migration_script: str, conn_params: Dict[str, Any]) -> None:
     """Run an SQL migration script using sqlite3."""
-    import sqlite3
+    conn, lock = _sqlite_conn(conn_params.get("database", ":memory:"))
+    with lock:
+        conn.executescript(migration_script)
 
-    conn = sqlite3.connect(conn_params.get("database", ":memory:"))
-    cur = conn.cursor()
-    cur.executescript(migration_script)
-    conn.commit()
-    conn.close()
 
+_MONGO_CLIENTS: Dict[str, Any] = {}
+_MONGO_GUARD = threading.Lock()
 
-def mongo_find(conn_params: Dict[str, Any], collection: str, filter: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Run a simple MongoDB find operation. Requires `pymongo`."""
-    from pymongo import MongoClient
 
-    client = MongoClient(conn_params["uri"])
-    db = client[conn_params["db"]]
-    results = list(db[collection].find(filter))
-    client.close()
-    return results
+def _mongo_client(uri: str) -> Any:
+    """Return a shared ``MongoClient`` for *uri*, creating it on first use.
+
+    ``MongoClient`` is thread-safe and pools its own sockets, so one instance
+    per URI avoids repeating topology discovery and auth on every call.
+    """
+    if MongoClient is None:
+        raise RuntimeError("mongo_find requires pymongo")
+    with _MONGO_GUARD:
+        client = _MONGO_CLIENTS.get(uri)
+        if client is None:
+            client = MongoClient(uri, maxPoolSize=100)
+            _MONGO_CLIENTS[uri] = client
+        return client
+
+
+@atexit.register
+def _close_mongo_clients() -> None:
+    for client in _MONGO_CLIENTS.values():
+        client.close()
+
+
+def mongo_find(
+    conn_params: Dict[str, Any],
+    collection: str,
+    filter: Dict[str, Any],
+    projection: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """Run a simple MongoDB find operation. Requires `pymongo`.
+
+    *projection* limits the returned fields, e.g. ``{"name": 1}``.
+    """
+    db = _mongo_client(conn_params["uri"])[conn_params["db"]]
+    return list(db[collection].find(filter, projection))
 
 
 # ---------------------------------------------------------------------------
 # Simple HTML parsing using BeautifulSoup
 # ---------------------------------------------------------------------------
 
+@functools.lru_cache(maxsize=512)
+def _compile_css(selector: str) -> Any:
+    return soupsieve.compile(selector)
+
+
 def extract_with_css(html: str, selector: str) -> List[str]:
-    """Extract text from *html* using a CSS selector."""
-    from bs4 import BeautifulSoup
+    """Extract text from *html* using a CSS selector.
 
-    soup = BeautifulSoup(html, "html.parser")
-    return [elem.get_text() for elem in soup.select(selector)]
+    Uses the ``lxml`` parser when it is installed and falls back to the
+    pure-Python ``html.parser`` otherwise.
+    """
+    if BeautifulSoup is None:
+        raise RuntimeError("extract_with_css requires beautifulsoup4")
+    soup = BeautifulSoup(html, _HTML_PARSER)
+    return [elem.get_text() for elem in _compile_css(selector).select(soup)]
 
 
 # ---------------------------------------------------------------------------
 # Basic auth helpers using JWT
 # ---------------------------------------------------------------------------
 
+# Tokens that already verified successfully, keyed by (token, secret digest)
+# and mapped to their ``exp`` claim (``None`` when they never expire).
+_JWT_VERIFIED: OrderedDict[tuple[str, str], Optional[float]] = OrderedDict()
+_JWT_VERIFIED_MAX = 4096
+_JWT_GUARD = threading.Lock()
+
+
+def _require_jwt() -> None:
+    if jwt is None:
+        raise RuntimeError("JWT helpers require pyjwt")
+
+
 def generate_jwt(payload: Dict[str, Any], secret: str) -> str:
     """Generate a JSON Web Token."""
-    import jwt
-
+    _require_jwt()
     return jwt.encode(payload, secret, algorithm="HS256")
 
 
 def verify_jwt(token: str, secret: str) -> bool:
-    """Verify a JSON Web Token."""
-    import jwt
+    """Verify a JSON Web Token.
+
+    Successful verifications are remembered until the token's ``exp`` claim,
+    so checking the same token again skips the HMAC and base64 decoding.
+    """
+    _require_jwt()
+    key = (token, hashlib.blake2b(secret.encode(), digest_size=16).hexdigest())
+    with _JWT_GUARD:
+        if key in _JWT_VERIFIED:
+            exp = _JWT_VERIFIED[key]
+            if exp is None or exp > time.time():
+                _JWT_VERIFIED.move_to_end(key)
+                return True
+            del _JWT_VERIFIED[key]
 
     try:
-        jwt.decode(token, secret, algorithms=["HS256"])
-        return True
+        claims = jwt.decode(token, secret, algorithms=["HS256"])
     except jwt.PyJWTError:
         return False
 
-
+    exp = claims.get("exp")
+    with _JWT_GUARD:
+        _JWT_VERIFIED[key] = float(exp) if exp is not None else None
+        while len(_JWT_VERIFIED) > _JWT_VERIFIED_MAX:
+            _JWT_VERIFIED.popitem(last=False)
+    return True
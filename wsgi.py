@@ -0,0 +1,16 @@
+"""WSGI entry point for running the app under Gunicorn with gevent workers.
+
+Usage::
+
+    gunicorn -k gevent -w 4 --worker-connections 1000 -b 0.0.0.0:5000 wsgi:application
+"""
+
+from gevent import monkey
+
+# Patch the stdlib before ``httpx``/``socket`` are imported so upstream
+# calls to Ollama yield to other greenlets instead of blocking the worker.
+monkey.patch_all()
+
+from app import app  # noqa: E402
+
+application = app